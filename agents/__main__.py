@@ -3,14 +3,34 @@ Main entry point for the agents package.
 """
 
 import asyncio
+import logging
 import os
 import sys
 
-from .simple_agent import SimpleAgent
+try:
+    import uvloop
+except ImportError:  # uvloop is an optional speedup
+    uvloop = None  # type: ignore[assignment]
+
+
+def _run(coro):
+    """Run a coroutine on uvloop when it is installed, asyncio otherwise."""
+    if uvloop is None:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
+async def _run_agent(agent) -> None:
+    try:
+        await agent.run()
+    finally:
+        await agent.aclose()
 
 
 def main():
     """Main entry point for running the agent."""
+    logging.basicConfig(level=logging.INFO)
+
     api_key = os.getenv("OPENAI_API_KEY")
 
     if not api_key:
@@ -20,19 +40,26 @@ def main():
         print("   Or create a .env file with: OPENAI_API_KEY=your_api_key_here")
         sys.exit(1)
 
+    # Imported only once the key is known to be set: SimpleAgent pulls in
+    # langchain/langgraph/openai, which dominate startup time.
+    from .simple_agent import SimpleAgent
+
     print("🤖 Starting SimpleAgent...")
     print("🎮 Make sure your game is running at: http://localhost:3000")
 
     agent = SimpleAgent(api_key=api_key)
 
     try:
-        asyncio.run(agent.run())
+        _run(_run_agent(agent))
     except KeyboardInterrupt:
         print("\n🛑 Agent stopped by user")
         agent.stop()
     except Exception as e:
         print(f"❌ Error running agent: {e}")
         sys.exit(1)
+    finally:
+        agent.game_client.close()
+        agent.llm_service.close()
 
 
 if __name__ == "__main__":
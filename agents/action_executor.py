@@ -1,40 +1,111 @@
 import json
-from typing import Any
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict
 
 from .game_client import GameClient
+from .utils import json_loads
+
+
+class ActionType(IntEnum):
+    """Actions the executor can perform against the game."""
+
+    MULTI_MOVE = 0
+    USE_COMPUTER = 1
+    USE_BUTTON = 2
+    SWITCH_AGENT = 3
+    RESET_POSITION = 4
+
+
+# Action names accepted on the wire (including the aliases the LLM tends to
+# produce), resolved once at import time.
+_STR_TO_ACTION: Dict[str, ActionType] = {
+    "multi_move": ActionType.MULTI_MOVE,
+    "move": ActionType.MULTI_MOVE,
+    "multi_move[right]": ActionType.MULTI_MOVE,
+    "multi_move[left]": ActionType.MULTI_MOVE,
+    "multi_move[up]": ActionType.MULTI_MOVE,
+    "multi_move[down]": ActionType.MULTI_MOVE,
+    "use_computer": ActionType.USE_COMPUTER,
+    "use_pc": ActionType.USE_COMPUTER,
+    "use_button": ActionType.USE_BUTTON,
+    "switch_agent": ActionType.SWITCH_AGENT,
+    "reset_position": ActionType.RESET_POSITION,
+}
+
+
+# Structured-output format for the verify step, so the model can only answer
+# with a known action. Parameters stay loosely typed since they differ per
+# action; ActionExecutor validates what it uses.
+ACTION_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "agent_action",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": [action.name.lower() for action in ActionType],
+                },
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "direction": {
+                            "type": "string",
+                            "enum": ["up", "down", "left", "right"],
+                        },
+                        "steps": {"type": "integer", "minimum": 1, "maximum": 10},
+                        "agent_index": {"type": "integer", "minimum": 0},
+                    },
+                },
+                "explanation": {"type": "string"},
+            },
+            "required": ["action", "parameters"],
+        },
+    },
+}
+
+
+def parse_action_type(action: Any) -> ActionType | None:
+    """Map an action name to its ActionType, or None if it is unknown."""
+    return _STR_TO_ACTION.get(action) if isinstance(action, str) else None
 
 
 class ActionExecutor:
     def __init__(self, game_client: GameClient) -> None:
         self.game_client = game_client
 
-    def execute(self, last_action: str) -> Any:
+        self._dispatch: Dict[
+            ActionType, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+        ] = {
+            ActionType.MULTI_MOVE: self._do_move,
+            ActionType.USE_COMPUTER: self._do_use_computer,
+            ActionType.USE_BUTTON: self._do_use_button,
+            ActionType.SWITCH_AGENT: self._do_switch_agent,
+            ActionType.RESET_POSITION: self._do_reset_position,
+        }
+
+    async def execute(self, last_action: Dict[str, Any] | str) -> Any:
+        """
+        Execute an action against the game.
+
+        Args:
+            last_action: The action as a dict, or as its JSON encoding
+
+        Returns:
+            The game's response, or an error dict
+        """
         try:
-            action_data = json.loads(last_action or "{}")
+            if isinstance(last_action, str):
+                action_data = json_loads(last_action or "{}")
+            else:
+                action_data = last_action
             action_type = action_data.get("action", "")
             parameters = action_data.get("parameters", {})
 
-            if (
-                action_type == "multi_move"
-                or action_type == "move"
-                or action_type == "multi_move[right]"
-                or action_type == "multi_move[left]"
-                or action_type == "multi_move[up]"
-                or action_type == "multi_move[down]"
-            ):
-                result = self.game_client.multi_move(
-                    parameters["direction"],
-                    parameters["steps"],
-                    parameters.get("agent_index", 0),
-                )
-            elif action_type == "use_computer" or action_type == "use_pc":
-                result = self.game_client.use_computer()
-            elif action_type == "use_button":
-                result = self.game_client.use_button()
-            elif action_type == "switch_agent":
-                result = self.game_client.switch_agent(parameters["agent_index"])
-            elif action_type == "reset_position":
-                result = self.game_client.reset_position()
+            action = parse_action_type(action_type)
+            if action is not None:
+                result = await self._dispatch[action](parameters)
             else:
                 result = {"success": False, "error": f"Unknown action: {action_type}"}
 
@@ -42,3 +113,22 @@ class ActionExecutor:
             result = {"success": False, "error": f"Action execution error: {str(e)}"}
 
         return result
+
+    async def _do_move(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.game_client.amulti_move(
+            parameters["direction"],
+            parameters["steps"],
+            parameters.get("agent_index", 0),
+        )
+
+    async def _do_use_computer(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.game_client.ause_computer()
+
+    async def _do_use_button(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.game_client.ause_button()
+
+    async def _do_switch_agent(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.game_client.aswitch_agent(parameters["agent_index"])
+
+    async def _do_reset_position(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.game_client.areset_position()
@@ -1,12 +1,168 @@
 """
 Agent Logger for tracking communication between the agent and the game.
 Creates session-based log files with sent and answered messages.
+
+Log calls only enqueue a record; formatting and file I/O happen on a
+background QueueListener thread so they stay off the agent's critical path.
+
+Set AGENT_LOG_FORMAT=msgpack to write a compact binary log instead of the
+human-readable one. Each record is a little-endian ``<u8 event><u32 length>``
+header followed by a msgpack map with the entry's timestamp, header, body
+and sections.
 """
 
-import json
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import struct
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .utils import json_dumpb
+
+try:
+    import ormsgpack
+except ImportError:  # ormsgpack comes in via langgraph, but is optional
+    ormsgpack = None  # type: ignore[assignment]
+
+LOG_BUFFER_SIZE = 64 * 1024
+
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_MSGPACK = "msgpack"
+
+# Event type codes written in the binary log record header.
+EVT_INFO = 1
+EVT_SENT = 2
+EVT_ANSWERED = 3
+EVT_ACTION = 4
+EVT_ERROR = 5
+
+_RECORD_HEADER = struct.Struct("<BI")
+
+# (label, payload) pairs rendered as "label: <JSON>" below an entry.
+Sections = Sequence[Tuple[str, Optional[Dict[str, Any]]]]
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+_ENTRY_SEPARATOR = b"-" * 30 + b"\n"
+
+
+def _format_section(label: str, payload: Dict[str, Any]) -> bytes:
+    """Render a section; small flat dicts stay on a single line."""
+    pretty = len(payload) > 4 or not all(
+        isinstance(value, _SCALAR_TYPES) for value in payload.values()
+    )
+    return b"%s: %s\n" % (label.encode(), json_dumpb(payload, pretty=pretty))
+
+
+def _context_sections(context: Optional[Dict[str, Any]]) -> Sections:
+    return (("Context", context),) if context else ()
+
+
+class _SessionFormatter(logging.Formatter):
+    """Render a session record in the human-readable log file layout."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        # (epoch second, "%H:%M:%S") of the last formatted timestamp
+        self._ts_cache: Tuple[int, str] = (-1, "")
+
+    def formatTime(
+        self, record: logging.LogRecord, datefmt: Optional[str] = None
+    ) -> str:
+        # Bursts of entries usually land in the same second, so reuse the
+        # previous string instead of calling strftime for every record.
+        second = int(record.created)
+        if self._ts_cache[0] != second:
+            self._ts_cache = (
+                second,
+                time.strftime("%H:%M:%S", self.converter(second)),
+            )
+        return self._ts_cache[1]
+
+    def format(self, record: logging.LogRecord) -> str:
+        return self.format_bytes(record).decode()
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """Render the entry straight to UTF-8, including the separator line."""
+        timestamp = self.formatTime(record)
+        buf = bytearray(f"[{timestamp}] {record.getMessage()}\n".encode())
+
+        body = getattr(record, "body", None)
+        if body is not None:
+            buf += body.encode()
+            buf += b"\n"
+
+        for label, payload in getattr(record, "sections", ()):
+            if payload:
+                buf += _format_section(label, payload)
+
+        buf += _ENTRY_SEPARATOR
+        return bytes(buf)
+
+
+class _BinaryFileHandler(logging.Handler):
+    """Base for handlers appending bytes to a buffered session file."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        # Records are written from the listener thread; the file buffer is
+        # only flushed when it fills up or the handler is closed.
+        self._fh = open(path, "ab", buffering=LOG_BUFFER_SIZE)
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            self._fh.close()
+        finally:
+            self.release()
+        super().close()
+
+
+class _SessionFileHandler(_BinaryFileHandler):
+    """Append human-readable entries rendered by _SessionFormatter."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._session_formatter = _SessionFormatter()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._fh.write(self._session_formatter.format_bytes(record))
+        except Exception:
+            self.handleError(record)
+
+
+class _MsgpackFileHandler(_BinaryFileHandler):
+    """Append length-prefixed msgpack records to a buffered binary file."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            payload: Dict[str, Any] = {
+                "ts": record.created,
+                "header": record.getMessage(),
+                "body": getattr(record, "body", None),
+            }
+            for label, section in getattr(record, "sections", ()):
+                if section:
+                    payload[label.lower()] = section
+            buf = ormsgpack.packb(payload, option=ormsgpack.OPT_NON_STR_KEYS)
+            self._fh.write(_RECORD_HEADER.pack(getattr(record, "event", 0), len(buf)))
+            self._fh.write(buf)
+        except Exception:
+            self.handleError(record)
+
+
+class _SessionQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record can be passed
+        # through as-is instead of being pre-formatted on the caller's thread.
+        return record
 
 
 class AgentLogger:
@@ -24,9 +180,21 @@ class AgentLogger:
         self.session_name = (
             session_name or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         )
-        self.log_file_path = os.path.join(self.logs_dir, f"{self.session_name}.log")
+        self.log_format = os.getenv("AGENT_LOG_FORMAT", LOG_FORMAT_TEXT).lower()
+        if self.log_format == LOG_FORMAT_MSGPACK and ormsgpack is None:
+            print("ormsgpack is not installed, falling back to text session logs")
+            self.log_format = LOG_FORMAT_TEXT
+        extension = "msgpack" if self.log_format == LOG_FORMAT_MSGPACK else "log"
+        self.log_file_path = os.path.join(
+            self.logs_dir, f"{self.session_name}.{extension}"
+        )
         self._initialized = False
 
+        # A standalone logger (not registered in the logging hierarchy) so
+        # sessions never share handlers and nothing propagates to the root.
+        self._logger = logging.Logger("agents.session", logging.INFO)
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
     def _ensure_logs_directory(self) -> None:
         """Create the logs directory if it doesn't exist."""
         if not os.path.exists(self.logs_dir):
@@ -47,16 +215,44 @@ class AgentLogger:
             "log_file": self.log_file_path,
         }
 
-        with open(self.log_file_path, "w", encoding="utf-8") as f:
-            f.write("# Agent Session Log\n")
-            f.write(f"# Session: {self.session_name}\n")
-            f.write(f"# Started: {session_info['start_time']}\n")
-            f.write(f"# Log File: {self.log_file_path}\n")
-            f.write(f"{'=' * 50}\n\n")
+        file_handler: logging.Handler
+        if self.log_format == LOG_FORMAT_MSGPACK:
+            # Start from an empty file; the session start is the first record.
+            open(self.log_file_path, "wb").close()
+            file_handler = _MsgpackFileHandler(self.log_file_path)
+        else:
+            with open(self.log_file_path, "w", encoding="utf-8") as f:
+                f.write("# Agent Session Log\n")
+                f.write(f"# Session: {self.session_name}\n")
+                f.write(f"# Started: {session_info['start_time']}\n")
+                f.write(f"# Log File: {self.log_file_path}\n")
+                f.write(f"{'=' * 50}\n\n")
+            file_handler = _SessionFileHandler(self.log_file_path)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._logger.addHandler(_SessionQueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self.close_session)
 
         print(f"Initialized log file: {self.log_file_path}")
         self._initialized = True
 
+    def _log(
+        self,
+        event: int,
+        header: str,
+        body: Optional[str] = None,
+        sections: Sections = (),
+    ) -> None:
+        """Enqueue one entry for the background writer."""
+        self._initialize_log_file()
+        self._logger.info(
+            header, extra={"event": event, "body": body, "sections": sections}
+        )
+
     def log_sent(self, message: str, context: Optional[Dict[str, Any]] = None) -> None:
         """
         Log a message sent to the agent.
@@ -65,38 +261,12 @@ class AgentLogger:
             message: The message sent to the agent
             context: Optional context information (e.g., game state, action type)
         """
-        self._initialize_log_file()
-
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        with open(self.log_file_path, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] SENT:\n")
-            f.write(f"{message}\n")
-
-            if context:
-                f.write(
-                    f"Context: {json.dumps(context, indent=2, ensure_ascii=False)}\n"
-                )
-
-            f.write(f"{'-' * 30}\n")
+        self._log(EVT_SENT, "SENT:", message, _context_sections(context))
 
     def log_answered(
         self, response: str, context: Optional[Dict[str, Any]] = None
     ) -> None:
-        self._initialize_log_file()
-
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        with open(self.log_file_path, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] LLM RESPONSE:\n")
-            f.write(f"{response}\n")
-
-            if context:
-                f.write(
-                    f"Context: {json.dumps(context, indent=2, ensure_ascii=False)}\n"
-                )
-
-            f.write(f"{'-' * 30}\n")
+        self._log(EVT_ANSWERED, "LLM RESPONSE:", response, _context_sections(context))
 
     def log_action(
         self,
@@ -112,22 +282,11 @@ class AgentLogger:
             parameters: Action parameters
             result: Action result
         """
-        self._initialize_log_file()
-
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        with open(self.log_file_path, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] ACTION: {action}\n")
-
-            if parameters:
-                f.write(
-                    f"Parameters: {json.dumps(parameters, indent=2, ensure_ascii=False)}\n"
-                )
-
-            if result:
-                f.write(f"Result: {json.dumps(result, indent=2, ensure_ascii=False)}\n")
-
-            f.write(f"{'-' * 30}\n")
+        self._log(
+            EVT_ACTION,
+            f"ACTION: {action}",
+            sections=(("Parameters", parameters), ("Result", result)),
+        )
 
     def log_error(self, error: str, context: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -137,20 +296,7 @@ class AgentLogger:
             error: Error message
             context: Optional context information
         """
-        self._initialize_log_file()
-
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        with open(self.log_file_path, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] ERROR:\n")
-            f.write(f"{error}\n")
-
-            if context:
-                f.write(
-                    f"Context: {json.dumps(context, indent=2, ensure_ascii=False)}\n"
-                )
-
-            f.write(f"{'-' * 30}\n")
+        self._log(EVT_ERROR, "ERROR:", error, _context_sections(context))
 
     def log_info(self, info: str, context: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -160,24 +306,24 @@ class AgentLogger:
             info: Information message
             context: Optional context information
         """
-        self._initialize_log_file()
-
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        with open(self.log_file_path, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] INFO:\n")
-            f.write(f"{info}\n")
-
-            if context:
-                f.write(
-                    f"Context: {json.dumps(context, indent=2, ensure_ascii=False)}\n"
-                )
-
-            f.write(f"{'-' * 30}\n")
+        self._log(EVT_INFO, "INFO:", info, _context_sections(context))
 
     def close_session(self) -> None:
         """Close the session and log final information."""
-        if not self._initialized:
+        if not self._initialized or self._listener is None:
+            return
+
+        # Drain the queue and close the file before writing the footer.
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+        self._listener = None
+        atexit.unregister(self.close_session)
+
+        if self.log_format == LOG_FORMAT_MSGPACK:
+            print(f"Session log completed: {self.log_file_path}")
             return
 
         end_time = datetime.now().isoformat()
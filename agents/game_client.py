@@ -2,103 +2,284 @@
 Game API client for communicating with the Next.js turn-based game.
 """
 
-import json
 import logging
-from typing import Any, Dict
+import time
+from typing import Any, Dict, Optional, Tuple
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .utils import JSON_HEADERS, LazyAsyncClient, json_dumpb, json_loads
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout in seconds for game API calls, so a stalled game
+# server fails the call instead of hanging the agent.
+GAME_API_TIMEOUT = (1.0, 5.0)
+
 
 class GameClient:
     def __init__(self, base_url: str = "http://localhost:3000/api"):
         self.base_url = base_url
 
+        # A single session keeps the TCP connection to the game alive between
+        # calls instead of reconnecting on every request.
+        self._session = requests.Session()
+        self._session.headers["Connection"] = "keep-alive"
+        # Retry transient gateway errors. urllib3 only retries idempotent
+        # methods by default, so game-changing POSTs are never replayed.
+        retries = Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._multi_move_url = f"{base_url}/character/multi-move"
+        self._reset_url = f"{base_url}/character/reset"
+        self._switch_agent_url = f"{base_url}/character/switch-agent"
+        self._use_button_url = f"{base_url}/character/use-button"
+        self._use_pc_url = f"{base_url}/character/use-pc"
+        self._agent_events_url = f"{base_url}/agent/events"
+        self._level_info_url = f"{base_url}/level/info"
+
+        self._aclient = LazyAsyncClient(
+            timeout=httpx.Timeout(GAME_API_TIMEOUT[1], connect=GAME_API_TIMEOUT[0]),
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+
+        # Last fetched game state and its monotonic timestamp. Any call that
+        # changes the game clears it.
+        self._state_cache: Optional[Dict[str, Any]] = None
+        self._state_cache_ts = 0.0
+        # (ETag, state) of the last full game state response, used to make
+        # conditional requests; the game answers 304 when nothing changed.
+        self._state_etag: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        self._session.close()
+
+    async def aclose(self) -> None:
+        """Close the async client used by the a* game API methods."""
+        await self._aclient.aclose()
+
+    def invalidate_state_cache(self) -> None:
+        """Forget the cached game state so the next read hits the server."""
+        self._state_cache = None
+
+    def _cached_state(self, max_age_s: float) -> Optional[Dict[str, Any]]:
+        if (
+            self._state_cache is not None
+            and time.monotonic() - self._state_cache_ts < max_age_s
+        ):
+            return self._state_cache
+        return None
+
+    def _store_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        self._state_cache = state
+        self._state_cache_ts = time.monotonic()
+        return state
+
+    def _state_request_headers(self) -> Optional[Dict[str, str]]:
+        if self._state_etag is None:
+            return None
+        return {"If-None-Match": self._state_etag[0]}
+
+    def _state_from_response(
+        self, response: requests.Response | httpx.Response
+    ) -> Dict[str, Any]:
+        if response.status_code == 304 and self._state_etag is not None:
+            return self._store_state(self._state_etag[1])
+
+        state = json_loads(response.content).get("data", {})
+        etag = response.headers.get("ETag")
+        self._state_etag = (etag, state) if etag else None
+        return self._store_state(state)
+
     def multi_move(
         self, direction: str, steps: int, agent_index: int = 0
     ) -> Dict[str, Any]:
         """Move character multiple steps in one direction."""
-        url = f"{self.base_url}/character/multi-move"
+        self.invalidate_state_cache()
         payload = {"direction": direction, "steps": steps, "agentIndex": agent_index}
 
-        response = requests.post(url, json=payload)
-        response_data = response.json()
+        response = self._session.post(
+            self._multi_move_url,
+            data=json_dumpb(payload),
+            headers=JSON_HEADERS,
+            timeout=GAME_API_TIMEOUT,
+        )
+        response_data = json_loads(response.content)
 
         return response_data
 
     def reset_position(self) -> Dict[str, Any]:
         """Reset character position to starting position."""
-        url = f"{self.base_url}/character/reset"
-
-        response = requests.post(url)
-        response_data = response.json()
+        self.invalidate_state_cache()
+        response = self._session.post(self._reset_url, timeout=GAME_API_TIMEOUT)
+        response_data = json_loads(response.content)
 
         return response_data
 
     def switch_agent(self, agent_index: int) -> Dict[str, Any]:
         """Switch to a different agent."""
-        url = f"{self.base_url}/character/switch-agent"
+        self.invalidate_state_cache()
         payload = {"agentIndex": agent_index}
 
-        response = requests.post(url, json=payload)
-        response_data = response.json()
+        response = self._session.post(
+            self._switch_agent_url,
+            data=json_dumpb(payload),
+            headers=JSON_HEADERS,
+            timeout=GAME_API_TIMEOUT,
+        )
+        response_data = json_loads(response.content)
 
         return response_data
 
     def use_button(self) -> Dict[str, Any]:
         """Press button to activate bridges."""
-        url = f"{self.base_url}/character/use-button"
-
-        response = requests.post(url)
-        response_data = response.json()
+        self.invalidate_state_cache()
+        response = self._session.post(self._use_button_url, timeout=GAME_API_TIMEOUT)
+        response_data = json_loads(response.content)
 
         return response_data
 
     def use_computer(self) -> Dict[str, Any]:
         """Use computer to complete the level."""
-        url = f"{self.base_url}/character/use-pc"
-
-        response = requests.post(url)
-        response_data = response.json()
+        self.invalidate_state_cache()
+        response = self._session.post(self._use_pc_url, timeout=GAME_API_TIMEOUT)
+        response_data = json_loads(response.content)
 
         return response_data
 
     # ----- Agent stream helpers -----
     def agent_add_message(self, text: str, type_: str = "info") -> Dict[str, Any]:
         """Add a new live agent message in UI via Next API."""
-        url = f"{self.base_url}/agent/events"
         payload = {"action": "add", "message": {"text": text, "type": type_}}
-        response = requests.post(url, json=payload)
-        response_data = response.json()
+        response = self._session.post(
+            self._agent_events_url,
+            data=json_dumpb(payload),
+            headers=JSON_HEADERS,
+            timeout=GAME_API_TIMEOUT,
+        )
+        response_data = json_loads(response.content)
 
         return response_data
 
     def agent_update_last(self, text: str, type_: str = "info") -> Dict[str, Any]:
         """Update the last live agent message (stream-like)."""
-        url = f"{self.base_url}/agent/events"
         payload = {"action": "update_last", "message": {"text": text, "type": type_}}
-        response = requests.post(url, json=payload)
-        response_data = response.json()
+        response = self._session.post(
+            self._agent_events_url,
+            data=json_dumpb(payload),
+            headers=JSON_HEADERS,
+            timeout=GAME_API_TIMEOUT,
+        )
+        response_data = json_loads(response.content)
 
         return response_data
 
     def get_level_info(self) -> Dict[str, Any]:
         """Get current level information and layout."""
-        url = f"{self.base_url}/level/info"
-
-        response = requests.get(url)
-        response_data = response.json()
+        response = self._session.get(self._level_info_url, timeout=GAME_API_TIMEOUT)
+        response_data = json_loads(response.content)
 
         return response_data
 
-    def get_game_state(self) -> Dict[str, Any]:
-        """Get current game state including all agents and positions."""
-        url = f"{self.base_url}/character/multi-move"
+    def get_game_state(self, max_age_s: float = 0.0) -> Dict[str, Any]:
+        """
+        Get current game state including all agents and positions.
+
+        Args:
+            max_age_s: Return the cached state if it was fetched less than
+                       this many seconds ago and nothing has changed the game
+                       since. The default always asks the server.
+        """
+        cached = self._cached_state(max_age_s)
+        if cached is not None:
+            return cached
+
+        response = self._session.get(
+            self._multi_move_url,
+            headers=self._state_request_headers(),
+            timeout=GAME_API_TIMEOUT,
+        )
+        return self._state_from_response(response)
+
+    # ----- Async variants -----
+    async def amulti_move(
+        self, direction: str, steps: int, agent_index: int = 0
+    ) -> Dict[str, Any]:
+        """Async version of multi_move."""
+        self.invalidate_state_cache()
+        payload = {"direction": direction, "steps": steps, "agentIndex": agent_index}
+
+        response = await self._aclient.client().post(
+            self._multi_move_url, content=json_dumpb(payload), headers=JSON_HEADERS
+        )
+        return json_loads(response.content)
+
+    async def areset_position(self) -> Dict[str, Any]:
+        """Async version of reset_position."""
+        self.invalidate_state_cache()
+        response = await self._aclient.client().post(self._reset_url)
+        return json_loads(response.content)
+
+    async def aswitch_agent(self, agent_index: int) -> Dict[str, Any]:
+        """Async version of switch_agent."""
+        self.invalidate_state_cache()
+        payload = {"agentIndex": agent_index}
+
+        response = await self._aclient.client().post(
+            self._switch_agent_url, content=json_dumpb(payload), headers=JSON_HEADERS
+        )
+        return json_loads(response.content)
+
+    async def ause_button(self) -> Dict[str, Any]:
+        """Async version of use_button."""
+        self.invalidate_state_cache()
+        response = await self._aclient.client().post(self._use_button_url)
+        return json_loads(response.content)
+
+    async def ause_computer(self) -> Dict[str, Any]:
+        """Async version of use_computer."""
+        self.invalidate_state_cache()
+        response = await self._aclient.client().post(self._use_pc_url)
+        return json_loads(response.content)
+
+    async def aagent_add_message(
+        self, text: str, type_: str = "info"
+    ) -> Dict[str, Any]:
+        """Async version of agent_add_message."""
+        payload = {"action": "add", "message": {"text": text, "type": type_}}
+        response = await self._aclient.client().post(
+            self._agent_events_url, content=json_dumpb(payload), headers=JSON_HEADERS
+        )
+        return json_loads(response.content)
+
+    async def aagent_update_last(
+        self, text: str, type_: str = "info"
+    ) -> Dict[str, Any]:
+        """Async version of agent_update_last."""
+        payload = {"action": "update_last", "message": {"text": text, "type": type_}}
+        response = await self._aclient.client().post(
+            self._agent_events_url, content=json_dumpb(payload), headers=JSON_HEADERS
+        )
+        return json_loads(response.content)
+
+    async def aget_level_info(self) -> Dict[str, Any]:
+        """Async version of get_level_info."""
+        response = await self._aclient.client().get(self._level_info_url)
+        return json_loads(response.content)
 
-        response = requests.get(url)
-        response_data = response.json()
+    async def aget_game_state(self, max_age_s: float = 0.0) -> Dict[str, Any]:
+        """Async version of get_game_state."""
+        cached = self._cached_state(max_age_s)
+        if cached is not None:
+            return cached
 
-        return response_data.get("data", {})
+        response = await self._aclient.client().get(
+            self._multi_move_url, headers=self._state_request_headers()
+        )
+        return self._state_from_response(response)
@@ -1,10 +1,160 @@
-import json
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 import requests
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
+from .utils import JSON_HEADERS, LazyAsyncClient, json_dumpb, json_loads
+
+# Number of converted messages remembered between completion calls.
+CONVERTED_MESSAGE_CACHE_SIZE = 64
+
+
+class _DeltaBatcher:
+    """Accumulate deltas and decide when a batch is due (see batched_stream)."""
+
+    def __init__(
+        self, min_batch: int, max_batch: int, growth: float, max_delay_ms: float
+    ) -> None:
+        self._buf: List[str] = []
+        self._size = float(min_batch)
+        self._max_batch = max_batch
+        self._growth = growth
+        self._max_delay_s = max_delay_ms / 1000
+        self._deadline = time.monotonic() + self._max_delay_s
+
+    def push(self, delta: str) -> Optional[str]:
+        """Add a delta; return the joined batch if it should be flushed now."""
+        self._buf.append(delta)
+        now = time.monotonic()
+        if len(self._buf) < self._size and now < self._deadline:
+            return None
+        self._size = min(self._max_batch, self._size * self._growth)
+        self._deadline = now + self._max_delay_s
+        return self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is buffered, or None if nothing is."""
+        if not self._buf:
+            return None
+        batch = "".join(self._buf)
+        self._buf.clear()
+        return batch
+
+
+def batched_stream(
+    deltas: Iterable[str],
+    min_batch: int = 1,
+    max_batch: int = 32,
+    growth: float = 3.0,
+    max_delay_ms: float = 50,
+) -> Iterator[str]:
+    """
+    Coalesce streamed deltas into progressively larger chunks.
+
+    The first chunk is emitted as soon as ``min_batch`` deltas arrive, so
+    time-to-first-token is unchanged; later chunks grow by ``growth`` up to
+    ``max_batch`` deltas, or are flushed once ``max_delay_ms`` has passed.
+
+    Args:
+        deltas: Stream of text deltas
+        min_batch: Number of deltas in the first chunk
+        max_batch: Upper bound on deltas per chunk
+        growth: Factor the batch size grows by after each flush
+        max_delay_ms: Flush a partial batch after this long
+
+    Returns:
+        Iterator over concatenated chunks
+    """
+    batcher = _DeltaBatcher(min_batch, max_batch, growth, max_delay_ms)
+    for delta in deltas:
+        if delta:
+            batch = batcher.push(delta)
+            if batch is not None:
+                yield batch
+    rest = batcher.flush()
+    if rest is not None:
+        yield rest
+
+
+async def abatched_stream(
+    deltas: AsyncIterable[str],
+    min_batch: int = 1,
+    max_batch: int = 32,
+    growth: float = 3.0,
+    max_delay_ms: float = 50,
+) -> AsyncIterator[str]:
+    """Async version of batched_stream."""
+    batcher = _DeltaBatcher(min_batch, max_batch, growth, max_delay_ms)
+    async for delta in deltas:
+        if delta:
+            batch = batcher.push(delta)
+            if batch is not None:
+                yield batch
+    rest = batcher.flush()
+    if rest is not None:
+        yield rest
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Normalize the content of a LangChain message chunk to a string."""
+    delta = getattr(chunk, "content", None)
+    if isinstance(delta, list):
+        delta = "".join(str(part) for part in delta)
+    if not isinstance(delta, str):
+        delta = str(delta) if delta is not None else ""
+    return delta
+
+
+def _sse_content(line: bytes) -> Optional[str]:
+    """
+    Extract the content delta from one raw SSE line.
+
+    Works on raw bytes: orjson parses them directly, so nothing is decoded
+    or stripped per token.
+
+    Args:
+        line: One undecoded line of the event stream
+
+    Returns:
+        The delta ("" for lines without content), or None at ``[DONE]``
+    """
+    if not line.startswith(b"data:"):
+        return ""
+    data = line[5:].strip()
+    if data == b"[DONE]":
+        return None
+    try:
+        obj = json_loads(data)
+        choices = obj.get("choices", [])
+        if choices:
+            delta_obj = choices[0].get("delta", {}) or choices[0].get("message", {})
+            return delta_obj.get("content", "") or ""
+    except Exception:
+        pass
+    return ""
+
+
+def _chat_kwargs(response_format: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keyword arguments for ChatOpenAI.stream/astream."""
+    return {} if response_format is None else {"response_format": response_format}
+
+
+async def _aiter_byte_lines(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Yield the undecoded lines of a streamed httpx response."""
+    pending = b""
+    async for chunk in response.aiter_bytes():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
 
 class LLMService:
     def __init__(
@@ -18,71 +168,144 @@ class LLMService:
         self.use_llm_studio = use_llm_studio
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self._completions_url = f"{self.base_url}/v1/chat/completions"
+
+        # Reuse one connection to LLM Studio across completions.
+        self._http = requests.Session()
+        # No read timeout: the gap before the first token can be long.
+        self._aclient = LazyAsyncClient(
+            timeout=httpx.Timeout(None, connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+
+        # id(message) -> (message, converted dict). The agent resends a sliding
+        # window of its history, so most messages are converted only once;
+        # holding the message keeps its id from being reused while cached.
+        self._converted: OrderedDict[
+            int, Tuple[SystemMessage | HumanMessage | AIMessage, Dict[str, str]]
+        ] = OrderedDict()
+
+    def close(self) -> None:
+        """Close the HTTP session used for LLM Studio requests."""
+        self._http.close()
+
+    async def aclose(self) -> None:
+        """Close the async client used for streaming LLM Studio requests."""
+        await self._aclient.aclose()
+
+    def _completion_payload(
+        self,
+        messages: List[SystemMessage | HumanMessage | AIMessage],
+        temperature: float,
+        stream: bool,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        payload = {
+            "model": self.model,
+            "messages": self.convert_messages(messages),
+            "temperature": temperature,
+            "max_tokens": -1,
+            "stream": stream,
+        }
+        if response_format is not None:
+            payload["response_format"] = response_format
+        return payload
 
     def convert_messages(
         self, messages: List[SystemMessage | HumanMessage | AIMessage]
     ) -> List[Dict[str, str]]:
         converted: List[Dict[str, str]] = []
         for m in messages:
-            role = "user"
-            if isinstance(m, SystemMessage):
-                role = "system"
-            elif isinstance(m, HumanMessage):
-                role = "user"
-            elif isinstance(m, AIMessage):
-                role = "assistant"
-            content = m.content if isinstance(m.content, str) else str(m.content)
-            converted.append({"role": role, "content": content})
+            entry = self._converted.get(id(m))
+            if entry is None or entry[0] is not m:
+                entry = (m, self._convert_message(m))
+                self._converted[id(m)] = entry
+                if len(self._converted) > CONVERTED_MESSAGE_CACHE_SIZE:
+                    self._converted.popitem(last=False)
+            converted.append(entry[1])
         return converted
 
+    @staticmethod
+    def _convert_message(m: SystemMessage | HumanMessage | AIMessage) -> Dict[str, str]:
+        role = "user"
+        if isinstance(m, SystemMessage):
+            role = "system"
+        elif isinstance(m, HumanMessage):
+            role = "user"
+        elif isinstance(m, AIMessage):
+            role = "assistant"
+        content = m.content if isinstance(m.content, str) else str(m.content)
+        return {"role": role, "content": content}
+
     def stream_completion(
         self,
         messages: List[SystemMessage | HumanMessage | AIMessage],
         temperature: float,
+        response_format: Optional[Dict[str, Any]] = None,
     ):
-        """Yield delta strings from either OpenAI client or LLM Studio server."""
+        """
+        Yield delta strings from either OpenAI client or LLM Studio server.
+
+        Args:
+            messages: Messages to send
+            temperature: Sampling temperature (LLM Studio only)
+            response_format: Optional OpenAI-style ``response_format``, e.g. a
+                             JSON schema the response must follow
+        """
         if not self.use_llm_studio:
             assert self.llm is not None
-            for chunk in self.llm.stream(messages):
-                delta = getattr(chunk, "content", None)
-                if isinstance(delta, list):
-                    delta = "".join(str(part) for part in delta)
-                if not isinstance(delta, str):
-                    delta = str(delta) if delta is not None else ""
-                yield delta
+            for chunk in self.llm.stream(messages, **_chat_kwargs(response_format)):
+                yield _chunk_text(chunk)
             return
 
-        url = f"{self.base_url}/v1/chat/completions"
-        payload = {
-            "model": self.model,
-            "messages": self.convert_messages(messages),
-            "temperature": temperature,
-            "max_tokens": -1,
-            "stream": True,
-        }
-        with requests.post(url, json=payload, stream=True) as r:
+        payload = self._completion_payload(
+            messages, temperature, stream=True, response_format=response_format
+        )
+        with self._http.post(
+            self._completions_url,
+            data=json_dumpb(payload),
+            headers=JSON_HEADERS,
+            stream=True,
+        ) as r:
             r.raise_for_status()
-            for raw_line in r.iter_lines(decode_unicode=True):
-                if not raw_line:
-                    continue
-                line = raw_line.strip()
-                if not line.startswith("data:"):
-                    continue
-                data_str = line[5:].strip()
-                if data_str == "[DONE]":
+            for raw_line in r.iter_lines(chunk_size=8192):
+                piece = _sse_content(raw_line)
+                if piece is None:
                     break
-                try:
-                    obj = json.loads(data_str)
-                    choices = obj.get("choices", [])
-                    if choices:
-                        delta_obj = choices[0].get("delta", {}) or choices[0].get(
-                            "message", {}
-                        )
-                        piece = delta_obj.get("content", "")
-                        if piece:
-                            yield piece
-                except Exception:
-                    continue
+                if piece:
+                    yield piece
+
+    async def astream_completion(
+        self,
+        messages: List[SystemMessage | HumanMessage | AIMessage],
+        temperature: float,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Async version of stream_completion; does not block the event loop."""
+        if not self.use_llm_studio:
+            assert self.llm is not None
+            async for chunk in self.llm.astream(
+                messages, **_chat_kwargs(response_format)
+            ):
+                yield _chunk_text(chunk)
+            return
+
+        payload = self._completion_payload(
+            messages, temperature, stream=True, response_format=response_format
+        )
+        async with self._aclient.client().stream(
+            "POST",
+            self._completions_url,
+            content=json_dumpb(payload),
+            headers=JSON_HEADERS,
+        ) as r:
+            r.raise_for_status()
+            async for raw_line in _aiter_byte_lines(r):
+                piece = _sse_content(raw_line)
+                if piece is None:
+                    break
+                if piece:
+                    yield piece
 
     def invoke_completion(
         self,
@@ -101,17 +324,12 @@ class LLMService:
 
             return str(rc_any)
 
-        url = f"{self.base_url}/v1/chat/completions"
-        payload = {
-            "model": self.model,
-            "messages": self.convert_messages(messages),
-            "temperature": temperature,
-            "max_tokens": -1,
-            "stream": False,
-        }
-        http_response: requests.Response = requests.post(url, json=payload)
+        payload = self._completion_payload(messages, temperature, stream=False)
+        http_response: requests.Response = self._http.post(
+            self._completions_url, data=json_dumpb(payload), headers=JSON_HEADERS
+        )
         http_response.raise_for_status()
-        parsed: Dict[str, Any] = http_response.json()
+        parsed: Dict[str, Any] = json_loads(http_response.content)
         choices: List[Any] = parsed.get("choices", [])
         if choices:
             msg = choices[0].get("message", {})
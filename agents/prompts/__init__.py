@@ -1,8 +1,7 @@
-from typing import Any, Dict, List
+import functools
+from typing import Any, Dict, List, Tuple
 
-
-def get_rules_prompt() -> str:
-    return """
+RULES_PROMPT = """
 You are an AI agent controlling a character in a 2D platformer game. Your goal is to navigate the level and reach the computer (C) to complete the level.
 
 GAME MECHANICS:
@@ -24,80 +23,52 @@ AVAILABLE ACTIONS:
 """
 
 
+def get_rules_prompt() -> str:
+    return RULES_PROMPT
+
+
+# Tile under the agent -> (map marker, hint about what the agent can do there).
+_POSITION_MARKERS: Dict[str, Tuple[str, str]] = {
+    "L": ("H", "You are on ladder right now so you CAN move up or down."),
+    "B": ("G", "You are on button right now so you CAN press it."),
+    "C": ("J", "You are on computer right now so you CAN use it."),
+}
+_DEFAULT_POSITION_MARKER = (
+    "X",
+    "You are not on ladder right now so you can't move up or down.",
+)
+
+
 def build_level_prompt(level_info: Dict[str, Any]) -> str:
-    layout_string = ""
+    # A level's layout does not change while it is being played, so the
+    # rendered prompt is memoized on the layout rows and size.
     layout: List[str] = level_info.get("layout", [])
-    for row in layout:
-        layout_string += f"{row}\n"
+    size: Dict[str, Any] = level_info.get("size", {})
+    return _build_level_prompt_cached(tuple(layout), tuple(size.items()))
+
+
+@functools.lru_cache(maxsize=32)
+def _build_level_prompt_cached(
+    layout: Tuple[str, ...], size_items: Tuple[Tuple[str, Any], ...]
+) -> str:
+    layout_string = "".join(f"{row}\n" for row in layout)
 
     return f"""
 LEVEL INFORMATION:
-- Size: {level_info.get("size", {})}
+- Size: {dict(size_items)}
 - Layout:
 {layout_string}
 """
 
 
-def build_decision_prompt(game_data: Dict[str, Any], level_data: Dict[str, Any]) -> str:
-    position = game_data.get("position", {})
-    level_map = level_data.get("layout", [])
-    map_height = len(level_map)
-
-    helper_text = "You are not on ladder right now so you can't move up or down."
-
-    level_map = [list(row) for row in level_map]
-    current_pos_tile = level_map[position["y"]][position["x"]]
-    if current_pos_tile == "L":
-        level_map[position["y"]][position["x"]] = "H"
-        helper_text = "You are on ladder right now so you CAN move up or down."
-    elif current_pos_tile == "B":
-        level_map[position["y"]][position["x"]] = "G"
-        helper_text = "You are on button right now so you CAN press it."
-    elif current_pos_tile == "C":
-        level_map[position["y"]][position["x"]] = "J"
-        helper_text = "You are on computer right now so you CAN use it."
-    else:
-        level_map[position["y"]][position["x"]] = "X"
-
-    converted_agent_position = {
-        "x": position["x"],
-        "y": map_height - 1 - position["y"],
-    }
-    converted_agent_position_str = (
-        f"{{x: {converted_agent_position['x']}, y: {converted_agent_position['y']}}}"
-    )
-
-    computer_position = None
-    for y, row in enumerate(level_map):
-        if "C" in row:
-            computer_position = (y, row.index("C"))
-            break
-
-    level_map = ["".join(row) for row in level_map]
-
-    level_map_string = ""
-    for row in level_map:
-        level_map_string += f"{row}\n"
-
-    if computer_position:
-        computer_y_bottom_left = map_height - 1 - computer_position[0]
-        computer_pos_str = f"{{x: {computer_position[1]}, y: {computer_y_bottom_left}}}"
-    else:
-        computer_pos_str = "Not found"
-
-    return f"""
+# Sections of the decision prompt that never change. They lead the prompt so
+# every turn shares one long prefix, which OpenAI and local llama.cpp servers
+# reuse from their prompt cache instead of prefilling it again.
+_DECISION_PROMPT_PREFIX = f"""
 <GAME_RULES>
-{get_rules_prompt()}
+{RULES_PROMPT}
 </GAME_RULES>
 
-<GAME_STATE>
-- Current position: {converted_agent_position_str}
-- Computer position: {computer_pos_str}
-- Active agent: {game_data.get("activeAgent", 0)}
-- Agents count: {game_data.get("agentCount", 1)}
-- Available actions: {game_data.get("available_actions", [])}
-</GAME_STATE>
-
 <HINT>
     You can make multiple steps at ones in one direction.
     On ladders you need to move 1 step more up to be aligned with the platform to move left and right then.
@@ -111,31 +82,6 @@ def build_decision_prompt(game_data: Dict[str, Any], level_data: Dict[str, Any])
     you are buildting pat to pc you are not able to clumb by E empty spaces only by ladders
 </HINT>
 
-<LEVEL_MAP>
-{level_map_string}
-
-platforms (#), ladders (L), empty spaces (E), Computer (C), Button (B), your current position (X), your current ladder position (H), bridge (G)
-
-X is your current position, H means same as X but on ladder.
-G means same as X but you are on Button.
-J means same as X but you are on Computer.
-</LEVEL_MAP>
-
-<IMPORTANT>
-    YOU NEED TO STAY ON LADDERS TO BE ABLE TO MOVE UP AND DOWN! LADDERS ARE NOT EMPTY SPACES THYE HAVE SYMBOL (L)
-    Set your goal to reach the computer in few steps and move there.
-    DO not try to clumb up or down without ladders!
-
-    Do not try to execute actions that are not available in the Available actions
-    you can only use actions that are in the Available actions array.
-
-    Do not try to move under computer just to allign with it, you need to use ladders to reach it.
-    Just move up if computer above and down if computer below use ladders!!!
-
-    to activate pc you need to be on exact position of computer, not on ladder.
-    {helper_text}
-</IMPORTANT>
-
 <THINK>
   ACT AS DISCOVERER! DO NOT BE STUCK! DO NOT SCARE DO THE THINGS GO TO THE COMPUTER WITH BEST PATHFINDING ALGORITHM!
   YOU ARE THINKIN ABOUT YOUR NEXT ACTION HERE BE A DISCOVERER! TRY TO FIND THE BEST PATH TO THE COMPUTER!
@@ -184,8 +130,97 @@ try to count mathematically how many steps you need to make for this step that y
 """
 
 
-def build_verify_action_prompt() -> str:
-    return """
+def build_decision_prompt(game_data: Dict[str, Any], level_data: Dict[str, Any]) -> str:
+    # The agent often re-plans from the same tile, so the prompt is memoized
+    # on the parts of the game state it renders.
+    position = game_data.get("position", {})
+    return _build_decision_prompt_cached(
+        position["x"],
+        position["y"],
+        str(game_data.get("activeAgent", 0)),
+        str(game_data.get("agentCount", 1)),
+        str(game_data.get("available_actions", [])),
+        tuple(level_data.get("layout", [])),
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _build_decision_prompt_cached(
+    px: int,
+    py: int,
+    active_agent: str,
+    agent_count: str,
+    available_actions: str,
+    layout: Tuple[str, ...],
+) -> str:
+    level_map: List[str] = list(layout)
+    map_height = len(level_map)
+
+    # Mark the agent's tile by rebuilding only the row it is on.
+    row = level_map[py]
+    marker, helper_text = _POSITION_MARKERS.get(row[px], _DEFAULT_POSITION_MARKER)
+    level_map[py] = row[:px] + marker + row[px + 1 :]
+
+    converted_agent_position = {
+        "x": px,
+        "y": map_height - 1 - py,
+    }
+    converted_agent_position_str = (
+        f"{{x: {converted_agent_position['x']}, y: {converted_agent_position['y']}}}"
+    )
+
+    computer_position = None
+    for y, row in enumerate(level_map):
+        x = row.find("C")
+        if x >= 0:
+            computer_position = (y, x)
+            break
+
+    level_map_string = "".join(f"{row}\n" for row in level_map)
+
+    if computer_position:
+        computer_y_bottom_left = map_height - 1 - computer_position[0]
+        computer_pos_str = f"{{x: {computer_position[1]}, y: {computer_y_bottom_left}}}"
+    else:
+        computer_pos_str = "Not found"
+
+    return f"""{_DECISION_PROMPT_PREFIX}
+<GAME_STATE>
+- Current position: {converted_agent_position_str}
+- Computer position: {computer_pos_str}
+- Active agent: {active_agent}
+- Agents count: {agent_count}
+- Available actions: {available_actions}
+</GAME_STATE>
+
+<LEVEL_MAP>
+{level_map_string}
+
+platforms (#), ladders (L), empty spaces (E), Computer (C), Button (B), your current position (X), your current ladder position (H), bridge (G)
+
+X is your current position, H means same as X but on ladder.
+G means same as X but you are on Button.
+J means same as X but you are on Computer.
+</LEVEL_MAP>
+
+<IMPORTANT>
+    YOU NEED TO STAY ON LADDERS TO BE ABLE TO MOVE UP AND DOWN! LADDERS ARE NOT EMPTY SPACES THYE HAVE SYMBOL (L)
+    Set your goal to reach the computer in few steps and move there.
+    DO not try to clumb up or down without ladders!
+
+    Do not try to execute actions that are not available in the Available actions
+    you can only use actions that are in the Available actions array.
+
+    Do not try to move under computer just to allign with it, you need to use ladders to reach it.
+    Just move up if computer above and down if computer below use ladders!!!
+
+    to activate pc you need to be on exact position of computer, not on ladder.
+    {helper_text}
+</IMPORTANT>
+"""
+
+
+VERIFY_ACTION_PROMPT = """
 From everything that you said in previous messages, verify and execute the action.
 Return only JSON object with action and parameters.
 
@@ -209,3 +244,7 @@ ITs ok to move on E empty spaces to get to pc or ladders to climb up and down, b
 ALWAYS PICK AN ACTION DO NOT STUCK WITH action: null or action: "", you are DISCOVERER!
 JSON ONLY!
 """
+
+
+def build_verify_action_prompt() -> str:
+    return VERIFY_ACTION_PROMPT
@@ -5,17 +5,23 @@ Uses the SimpleAgent with LangChain/LangGraph for intelligent gameplay.
 """
 
 import asyncio
-import json
+import atexit
 import logging
 import os
+import queue
 import threading
 import time
+from collections import deque
+from itertools import islice
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
 from .game_client import GameClient
+from .llm_service import batched_stream
 from .simple_agent import SimpleAgent
+from .utils import LazyJSON, json_dumps, json_loads
 
 # Configure logging
 logging.basicConfig(
@@ -23,34 +29,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serve jsonify/request.get_json through orjson (via utils) when present."""
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return json_dumps(obj)
+        except TypeError:
+            # Types only Flask's encoder knows about (e.g. Decimal).
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Allow cross-origin requests from the frontend
 
 # Global state
 agent_thread = None
 agent_results: list = []
 
+# Only the most recent agent results are kept in memory.
+MAX_AGENT_RESULTS = 200
+
+# Seconds to wait for the agent's async clients to close at shutdown.
+AGENT_CLOSE_TIMEOUT_S = 5
+
+# Seconds between keep-alive comments on an idle results stream.
+RESULTS_KEEPALIVE_S = 15
+
 
 class AgentRunner:
     def __init__(self):
         self.game_client = GameClient()
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.agent = SimpleAgent(api_key=self.api_key) if self.api_key else None
-        self.results = []
+        self.results = deque(maxlen=MAX_AGENT_RESULTS)
+        self.active = False
+
+        # One queue per open /api/agent/results/stream connection; new
+        # results are pushed to each instead of clients polling /status.
+        self._subscribers = set()
+        self._subscribers_lock = threading.Lock()
+
+        # One long-lived event loop runs every agent session, so runs reuse
+        # the loop and the agent's async HTTP clients, which are bound to it,
+        # instead of each start spawning a thread with a fresh asyncio.run
+        # loop. The clients are closed on that loop in close().
+        self._loop = None
+
+    def _agent_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self._loop.run_forever, name="agent-loop", daemon=True
+            ).start()
+        return self._loop
+
+    def close(self):
+        """Release the HTTP sessions held by the runner and its agent."""
+        self.game_client.close()
+        if self.agent:
+            if self._loop is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        self.agent.aclose(), self._loop
+                    ).result(timeout=AGENT_CLOSE_TIMEOUT_S)
+                except Exception:
+                    logger.warning("Could not close the agent's async clients")
+            self.agent.game_client.close()
+            self.agent.llm_service.close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def subscribe(self):
+        """Register a queue that receives every result added from now on."""
+        results = queue.SimpleQueue()
+        with self._subscribers_lock:
+            self._subscribers.add(results)
+        return results
+
+    def unsubscribe(self, results):
+        with self._subscribers_lock:
+            self._subscribers.discard(results)
+
+    def _add_result(self, entry):
+        self.results.append(entry)
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for results in subscribers:
+            results.put(entry)
 
     def start_agent(self):
-        """Start the AI agent in a separate thread."""
+        """Start the AI agent on the background event loop."""
         if not self.agent:
             return {
                 "success": False,
                 "error": "OPENAI_API_KEY not set. Cannot start AI agent.",
             }
 
-        self.results = []
+        self.results = deque(maxlen=MAX_AGENT_RESULTS)
+        self.active = True
 
-        thread = threading.Thread(target=self._run_agent)
-        thread.daemon = True
-        thread.start()
+        future = asyncio.run_coroutine_threadsafe(self._run_agent(), self._agent_loop())
+        future.add_done_callback(self._log_agent_failure)
 
         return {"success": True, "message": "AI Agent started successfully"}
 
@@ -59,17 +144,26 @@ class AgentRunner:
         self.agent.stop()
         return {"success": True, "message": "Agent stopped"}
 
+    def recent_results(self, count=10):
+        """Return the most recent agent results, oldest first."""
+        return list(islice(self.results, max(0, len(self.results) - count), None))
+
     def get_status(self):
         """Get current agent status."""
         return {
             "running": self.agent.running,
-            "results": self.results[-10:] if self.results else [],  # Last 10 results
+            "results": self.recent_results(),
             "has_ai": self.agent is not None,
         }
 
-    def _run_agent(self):
+    @staticmethod
+    def _log_agent_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("❌ [AI_AGENT] Agent run failed", exc_info=future.exception())
+
+    async def _run_agent(self):
         logger.info("✅ [AI_AGENT] Connected to game successfully!")
-        self.results.append(
+        self._add_result(
             {
                 "timestamp": time.time(),
                 "type": "info",
@@ -77,17 +171,21 @@ class AgentRunner:
             }
         )
 
-        asyncio.run(self.agent.run())
-        self.results.append(
-            {
-                "timestamp": time.time(),
-                "type": "info",
-                "message": "AI Agent execution completed",
-            }
-        )
+        # Always end with a pushed result: stream clients only learn that the
+        # run is over from the "running" flag sent along with it.
+        outcome = {"type": "info", "message": "AI Agent execution completed"}
+        try:
+            await self.agent.run()
+        except Exception as e:
+            outcome = {"type": "error", "message": f"AI Agent execution failed: {e}"}
+            raise
+        finally:
+            self.active = False
+            self._add_result({"timestamp": time.time(), **outcome})
 
 
 agent_runner = AgentRunner()
+atexit.register(agent_runner.close)
 
 
 @app.route("/api/agent/start", methods=["POST"])
@@ -95,7 +193,7 @@ def start_agent():
     """Start the AI agent."""
     logger.info("📡 [API] Received request to start AI agent")
     result = agent_runner.start_agent()
-    logger.info(f"📡 [API] Start agent response: {json.dumps(result, indent=2)}")
+    logger.debug("📡 [API] Start agent response: %s", LazyJSON(result))
     return jsonify(result)
 
 
@@ -104,7 +202,7 @@ def stop_agent():
     """Stop the AI agent."""
     logger.info("📡 [API] Received request to stop AI agent")
     result = agent_runner.stop_agent()
-    logger.info(f"📡 [API] Stop agent response: {json.dumps(result, indent=2)}")
+    logger.debug("📡 [API] Stop agent response: %s", LazyJSON(result))
     return jsonify(result)
 
 
@@ -115,6 +213,56 @@ def get_agent_status():
     return jsonify(result)
 
 
+_HEARTBEAT_RUNNING = b'{"running":true}'
+_HEARTBEAT_IDLE = b'{"running":false}'
+
+
+@app.route("/api/agent/heartbeat", methods=["GET"])
+def get_agent_heartbeat():
+    """Report whether the agent is running, without the results list."""
+    agent = agent_runner.agent
+    body = (
+        _HEARTBEAT_RUNNING if agent is not None and agent.running else _HEARTBEAT_IDLE
+    )
+    return Response(body, mimetype="application/json")
+
+
+@app.route("/api/agent/results", methods=["GET"])
+def get_agent_results():
+    """Get the most recent agent results."""
+    return jsonify(agent_runner.recent_results())
+
+
+@app.route("/api/agent/results/stream", methods=["GET"])
+def stream_agent_results():
+    """Push agent results to the client as server-sent events."""
+    results = agent_runner.subscribe()
+
+    def frame(entry):
+        return (
+            f"data: {json_dumps({'running': agent_runner.active, 'result': entry})}\n\n"
+        )
+
+    def generate():
+        try:
+            for entry in agent_runner.recent_results():
+                yield frame(entry)
+            while True:
+                try:
+                    entry = results.get(timeout=RESULTS_KEEPALIVE_S)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield frame(entry)
+        finally:
+            agent_runner.unsubscribe(results)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 @app.route("/api/agent/test", methods=["GET"])
 def test_connection():
     """Test connection to the game."""
@@ -130,20 +278,21 @@ def make_move():
     try:
         data = request.get_json()
         direction = data.get("direction")
-        logger.info(f"📡 [API] Received manual move request: direction='{direction}'")
+        logger.info("📡 [API] Received manual move request: direction='%s'", direction)
 
         if not direction:
             logger.warning("📡 [API] Move request missing direction parameter")
             return jsonify({"success": False, "error": "Direction required"})
 
-        client = GameClient()
-        result = client.move_character(direction)
+        # Reuse the runner's long-lived requests session rather than opening
+        # a new client per move.
+        result = agent_runner.game_client.multi_move(direction, 1)
 
         response_data = {"success": True, "move_result": result}
-        logger.info(f"📡 [API] Move response: {json.dumps(response_data, indent=2)}")
+        logger.debug("📡 [API] Move response: %s", LazyJSON(response_data))
         return jsonify(response_data)
     except Exception as e:
-        logger.error(f"📡 [API] Move error: {str(e)}")
+        logger.error("📡 [API] Move error: %s", e)
         return jsonify({"success": False, "error": str(e)})
 
 
@@ -170,14 +319,47 @@ def ai_single_turn():
             "objective": turn_result.get("objective"),
         }
         logger.info(
-            f"📡 [API] AI turn response: Action='{turn_result.get('action')}', Objective='{turn_result.get('objective')}'"
+            "📡 [API] AI turn response: Action='%s', Objective='%s'",
+            turn_result.get("action"),
+            turn_result.get("objective"),
         )
         return jsonify(response_data)
     except Exception as e:
-        logger.error(f"📡 [API] AI turn error: {str(e)}")
+        logger.error("📡 [API] AI turn error: %s", e)
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route("/api/agent/ai-turn/stream", methods=["POST"])
+def ai_turn_stream():
+    """Stream the AI's next decision as server-sent events."""
+    logger.info("📡 [API] Received request for streamed AI turn")
+    if not agent_runner.agent:
+        logger.warning("📡 [API] AI agent not available - missing OPENAI_API_KEY")
+        return jsonify(
+            {
+                "success": False,
+                "error": "AI Agent not available. Set OPENAI_API_KEY.",
+            }
+        )
+
+    agent = agent_runner.agent
+
+    def generate():
+        try:
+            for delta in batched_stream(agent.stream_decision()):
+                yield f"data: {json_dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            logger.error("📡 [API] Streamed AI turn error: %s", e)
+            yield f"data: {json_dumps({'error': str(e)})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    # Keep reverse proxies from buffering the stream into one response.
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 @app.route("/api/agent/run-autonomous", methods=["POST"])
 def run_autonomous():
     """Run the AI agent autonomously until level completion."""
@@ -196,7 +378,7 @@ def run_autonomous():
         data = request.get_json() or {}
         max_turns = data.get("max_turns", 20)
 
-        logger.info(f"📡 [API] Starting autonomous run with max {max_turns} turns")
+        logger.info("📡 [API] Starting autonomous run with max %s turns", max_turns)
         results = agent_runner.agent.run_until_completion(max_turns=max_turns)
 
         # Get final status
@@ -212,15 +394,27 @@ def run_autonomous():
         }
 
         logger.info(
-            f"📡 [API] Autonomous run completed: {len(results)} turns, final objective: '{final_objective}'"
+            "📡 [API] Autonomous run completed: %d turns, final objective: '%s'",
+            len(results),
+            final_objective,
         )
         return jsonify(response_data)
 
     except Exception as e:
-        logger.error(f"📡 [API] Autonomous run error: {str(e)}")
+        logger.error("📡 [API] Autonomous run error: %s", e)
         return jsonify({"success": False, "error": str(e)})
 
 
+def run_server(host: str = "0.0.0.0", port: int = 5001) -> None:
+    """
+    Serve the app with one thread per request.
+
+    Debug mode (and its code reloader, which imports the agent twice) is
+    opt-in via FLASK_DEBUG=1.
+    """
+    app.run(host=host, port=port, debug=os.getenv("FLASK_DEBUG") == "1", threaded=True)
+
+
 if __name__ == "__main__":
     print("🤖 Starting SimpleAgent Server with LangChain/LangGraph...")
     print("📍 Server will be available at: http://localhost:5001")
@@ -229,4 +423,4 @@ if __name__ == "__main__":
     print(
         "🎯 SimpleAgent can navigate levels, use computers, activate bridges, and switch agents"
     )
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    run_server()
@@ -3,26 +3,28 @@ Simple Agent for controlling the game character using LangChain and LangGraph.
 This agent can perform all available actions: move, use computer, use button, switch agents, etc.
 """
 
-import json
+import asyncio
 import os
 import time
+from contextlib import aclosing
 from enum import Enum
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypedDict
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.runnables.config import RunnableConfig
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
+from langgraph.managed import RemainingSteps
 
-from agents.action_executor import ActionExecutor
+from agents.action_executor import ACTION_RESPONSE_FORMAT, ActionExecutor
 from agents.agent_logger import AgentLogger
 from agents.game_client import GameClient
-from agents.llm_service import LLMService
+from agents.llm_service import LLMService, abatched_stream
 from agents.prompts import (
     build_decision_prompt,
     build_verify_action_prompt,
 )
-from agents.utils import extract_json_from_text
+from agents.utils import JsonObjectEnd, extract_json_from_text
 
 
 class LLMStudioModel(Enum):
@@ -38,27 +40,85 @@ USE_LLM_STUDIO = True
 LLM_STUDIO_BASE_URL = "http://192.168.1.183:1234"
 LLM_STUDIO_MODEL = LLMStudioModel.GPT_OSS.value
 MODEL = "gpt-5-nano-2025-08-07"
+# Routes every request of the agent to the same OpenAI prompt-cache shard,
+# so turns reuse the cached decision-prompt prefix.
+PROMPT_CACHE_KEY = "simple_agent"
 
 TEMPERATURE = 1
 
 MAX_RECURSION_LIMIT = 500
 
+# Graph steps one turn takes: analyze, decide, verify and evaluate.
+STEPS_PER_TURN = 4
+
 CONTEXT_HISTORY_LENGTH = 7
 
+# Minimum seconds between streamed-response updates to the game's agent panel.
+UI_UPDATE_INTERVAL_S = 0.1
+
+# Actions invalidate the client's state cache, so this only lets
+# analyze_situation reuse the state fetched during initialize.
+GAME_STATE_MAX_AGE_S = 1.0
+
 
 class SimpleAgentState(TypedDict):
     messages: List[SystemMessage | HumanMessage | AIMessage]
     game_data: Dict[str, Any]
     level_data: Dict[str, Any]
-    last_action: str
+    last_action: Dict[str, Any]
     current_objective: str
     turn_count: int
     should_stop: bool
+    remaining_steps: RemainingSteps
+
+
+def _bound_node(name: str) -> Callable[..., Any]:
+    """
+    Build a graph node that forwards to the SimpleAgent method ``name``.
+
+    The compiled graph is shared by every SimpleAgent, so the instance is
+    looked up from the run config instead of being captured at compile time.
+    """
+
+    async def node(state: SimpleAgentState, config: RunnableConfig) -> Any:
+        agent = config["configurable"]["agent"]
+        return await getattr(agent, name)(state)
+
+    node.__name__ = name
+    return node
+
+
+def _should_continue(state: SimpleAgentState, config: RunnableConfig) -> str:
+    return config["configurable"]["agent"]._should_continue(state)
+
+
+def _quick_action(game_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Return an action that needs no LLM decision, if the state allows one.
+
+    The game only offers use_pc when the computer is on or next to the
+    agent's tile, where using it always completes the level.
+    """
+    if "use_pc" in game_data.get("available_actions", ()):
+        return {"action": "use_computer", "parameters": {}}
+    return None
+
+
+def _route_decision(state: SimpleAgentState) -> str:
+    action = _quick_action(state.get("game_data", {}))
+    # Still running after taking the same shortcut means it failed; let the
+    # LLM decide instead of retrying it every turn.
+    if action is None or action == state.get("last_action"):
+        return "decide"
+    return "quick"
 
 
 class SimpleAgent:
     running = False
 
+    # Compiled once per class on first use; see _get_graph.
+    _compiled_graph: Any = None
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -76,6 +136,9 @@ class SimpleAgent:
             self.llm = ChatOpenAI(
                 model=MODEL,
                 temperature=temperature,
+                # Sent as a raw body field: the pinned openai SDK has no
+                # prompt_cache_key argument on create().
+                extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
             )
         self.should_stop = False
 
@@ -87,14 +150,14 @@ class SimpleAgent:
         )
         self.action_executor = ActionExecutor(self.game_client)
 
-        self.graph = self._create_graph()
+        self.graph = self._get_graph()
 
     async def run(self) -> None:
         """Run the agent until completion or max turns reached."""
         self.running = True
         self.should_stop = False
 
-        self.logger = AgentLogger(f"session_{time.time()}")
+        self.logger = AgentLogger(f"session_{time.time_ns()}")
 
         # Log session start
         self.logger.log_info(
@@ -110,13 +173,15 @@ class SimpleAgent:
             "messages": [],
             "game_data": {},
             "level_data": {},
-            "last_action": "",
+            "last_action": {},
             "current_objective": "explore_and_find_computer",
             "turn_count": 0,
             "should_stop": False,
         }
 
-        config = RunnableConfig(recursion_limit=MAX_RECURSION_LIMIT)
+        config = RunnableConfig(
+            recursion_limit=MAX_RECURSION_LIMIT, configurable={"agent": self}
+        )
         final_state = await self.graph.ainvoke(initial_state, config)
 
         # Log session completion
@@ -134,32 +199,81 @@ class SimpleAgent:
 
         print(f"Agent completed with objective: {final_state['current_objective']}")
         print(f"Final action: {final_state['last_action']}")
-        print(f"Final result: {final_state['action_result']}")
 
     def stop(self) -> None:
         """Stop the agent."""
         self.should_stop = True
 
-    def _create_graph(self) -> Any:
+    async def aclose(self) -> None:
+        """
+        Close the async HTTP clients used by runs.
+
+        The clients stay open between runs so consecutive runs on the same
+        event loop reuse their pooled connections; call this on that loop
+        once the agent is no longer needed.
+        """
+        await self.game_client.aclose()
+        await self.llm_service.aclose()
+
+    def stream_decision(self) -> Iterator[str]:
+        """
+        Stream the LLM's next-move decision for the current game state.
+
+        Runs the same prompt as the decide_action node, outside the graph
+        and without executing anything, yielding deltas as they arrive.
+
+        Returns:
+            Iterator over non-empty response deltas
+        """
+        level_result = self.game_client.get_level_info()
+        level_data = (
+            level_result.get("data", {}).get("level", {})
+            if level_result.get("success")
+            else {}
+        )
+        game_data = self.game_client.get_game_state()
+
+        decision_prompt = build_decision_prompt(game_data, level_data)
+        for delta in self.llm_service.stream_completion(
+            [HumanMessage(content=decision_prompt)], temperature=TEMPERATURE
+        ):
+            if delta:
+                yield delta
+
+    @classmethod
+    def _get_graph(cls) -> Any:
+        """Return the compiled graph, compiling it on first use."""
+        if cls.__dict__.get("_compiled_graph") is None:
+            cls._compiled_graph = cls._create_graph()
+        return cls._compiled_graph
+
+    @staticmethod
+    def _create_graph() -> Any:
         """Create the LangGraph state graph for the simple agent."""
         builder = StateGraph(SimpleAgentState)
 
         # Nodes
-        builder.add_node("initialize", self._initialize)
-        builder.add_node("analyze_situation", self._analyze_situation)
-        builder.add_node("decide_action", self._decide_action)
-        builder.add_node("verify_action", self._verify_action)
-        builder.add_node("evaluate_result", self._evaluate_result)
+        builder.add_node("initialize", _bound_node("_initialize"))
+        builder.add_node("analyze_situation", _bound_node("_analyze_situation"))
+        builder.add_node("decide_action", _bound_node("_decide_action"))
+        builder.add_node("verify_action", _bound_node("_verify_action"))
+        builder.add_node("quick_action", _bound_node("_take_quick_action"))
+        builder.add_node("evaluate_result", _bound_node("_evaluate_result"))
 
         # Edges
         builder.add_edge(START, "initialize")
         builder.add_edge("initialize", "analyze_situation")
-        builder.add_edge("analyze_situation", "decide_action")
+        builder.add_conditional_edges(
+            "analyze_situation",
+            _route_decision,
+            {"quick": "quick_action", "decide": "decide_action"},
+        )
         builder.add_edge("decide_action", "verify_action")
         builder.add_edge("verify_action", "evaluate_result")
+        builder.add_edge("quick_action", "evaluate_result")
         builder.add_conditional_edges(
             "evaluate_result",
-            self._should_continue,
+            _should_continue,
             {"continue": "analyze_situation", "end": END},
         )
 
@@ -167,7 +281,11 @@ class SimpleAgent:
 
     async def _initialize(self, state: SimpleAgentState) -> Dict[str, Any]:
         """Initialize the agent by getting level and game state information."""
-        level_result = self.game_client.get_level_info()
+        # Independent requests: issue them together over the pooled client.
+        level_result, _ = await asyncio.gather(
+            self.game_client.aget_level_info(),
+            self.game_client.aget_game_state(),
+        )
         level_data_dict = (
             level_result.get("data", {}).get("level", {})
             if level_result.get("success")
@@ -178,7 +296,9 @@ class SimpleAgent:
 
     async def _analyze_situation(self, state: SimpleAgentState) -> Dict[str, Any]:
         """Analyze the current game situation."""
-        game_data = self.game_client.get_game_state()
+        game_data = await self.game_client.aget_game_state(
+            max_age_s=GAME_STATE_MAX_AGE_S
+        )
         return {"game_data": game_data}
 
     async def _decide_action(self, state: SimpleAgentState) -> Dict[str, Any]:
@@ -190,20 +310,13 @@ class SimpleAgent:
         decision_prompt = build_decision_prompt(game_data, level_data)
         messages.append(HumanMessage(content=decision_prompt))
         self.logger.log_sent(decision_prompt)
-        self.game_client.agent_add_message("Thinking about next decision...", "action")
 
-        response_content: str = ""
         # Took only last message to get clear understanding about the current
         # state only, and not all the history.
         last_messages = messages[-1:]
-
-        for delta in self.llm_service.stream_completion(
-            last_messages, temperature=TEMPERATURE
-        ):
-            if not delta:
-                continue
-            response_content += delta
-            self.game_client.agent_update_last(f"LLM: {response_content}", "action")
+        response_content = await self._stream_llm_to_game(
+            last_messages, "Thinking about next decision..."
+        )
 
         self.logger.log_answered(response_content)
         messages.append(AIMessage(content=response_content))
@@ -216,37 +329,118 @@ class SimpleAgent:
         verify_action_prompt = build_verify_action_prompt()
         messages.append(HumanMessage(content=verify_action_prompt))
         self.logger.log_sent(verify_action_prompt)
-        self.game_client.agent_add_message("Verifying decision...", "action")
 
         # Taking more messages here to get more context about the previous steps
         # to avoid repeating the same actions.
         last_messages = messages[-CONTEXT_HISTORY_LENGTH:]
-        response_content: str = ""
-        for delta in self.llm_service.stream_completion(
-            last_messages, temperature=TEMPERATURE
-        ):
-            if not delta:
-                continue
-            response_content += delta
-            self.game_client.agent_update_last(f"LLM: {response_content}", "action")
+        # Only the JSON object is used, so stop the stream once it is complete.
+        # The schema keeps the model to known actions; the text fallback below
+        # still covers servers that ignore response_format.
+        response_content = await self._stream_llm_to_game(
+            last_messages,
+            "Verifying decision...",
+            stop_after_json=True,
+            response_format=ACTION_RESPONSE_FORMAT,
+        )
 
         self.logger.log_answered(response_content)
         messages.append(AIMessage(content=response_content))
+        # Nothing older than the verify window is ever sent again, so keep
+        # the history bounded instead of growing it every turn.
+        del messages[:-CONTEXT_HISTORY_LENGTH]
 
         action_data = extract_json_from_text(response_content)
         if action_data is None:
             self.logger.log_error(f"No valid JSON found in response {response_content}")
             action_data = {"action": "get_game_state", "parameters": {}}
 
-        return {"last_action": json.dumps(action_data), "messages": messages}
+        return {"last_action": action_data, "messages": messages}
+
+    async def _stream_llm_to_game(
+        self,
+        messages: List[SystemMessage | HumanMessage | AIMessage],
+        status: str,
+        stop_after_json: bool = False,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Stream a completion while mirroring it into the game's agent panel.
+
+        Args:
+            messages: Messages to send to the LLM
+            status: Placeholder shown in the panel until the first delta
+            stop_after_json: End the stream (and the LLM request) as soon as
+                             the first JSON object in the response is complete
+            response_format: Optional structured-output format for the LLM
+
+        Returns:
+            The response text, up to the end of that object if stopped early
+        """
+        # Post the placeholder while the LLM request is in flight rather than
+        # before it, taking the game round-trip off the critical path.
+        placeholder = asyncio.create_task(
+            self.game_client.aagent_add_message(status, "action")
+        )
+        chunks: List[str] = []
+        last_update = 0.0
+        stale = False
+        json_end = JsonObjectEnd() if stop_after_json else None
+        try:
+            # Batch deltas so the game UI is updated once per chunk, not per token.
+            # aclosing() shuts both generators, and so the HTTP stream, when the
+            # loop is left early.
+            async with aclosing(
+                self.llm_service.astream_completion(
+                    messages, temperature=TEMPERATURE, response_format=response_format
+                )
+            ) as deltas, aclosing(abatched_stream(deltas)) as batches:
+                async for delta in batches:
+                    if not delta:
+                        continue
+                    end = json_end.feed(delta) if json_end else -1
+                    if end >= 0:
+                        chunks.append(delta[:end])
+                        stale = True
+                        break
+                    chunks.append(delta)
+                    now = time.monotonic()
+                    if now - last_update < UI_UPDATE_INTERVAL_S:
+                        stale = True
+                        continue
+                    # The update replaces the last message, so it must follow
+                    # the add.
+                    await placeholder
+                    await self.game_client.aagent_update_last(
+                        f"LLM: {''.join(chunks)}", "action"
+                    )
+                    last_update, stale = now, False
+
+            if stale:
+                await placeholder
+                await self.game_client.aagent_update_last(
+                    f"LLM: {''.join(chunks)}", "action"
+                )
+        finally:
+            await placeholder
+
+        return "".join(chunks)
+
+    async def _take_quick_action(self, state: SimpleAgentState) -> Dict[str, Any]:
+        """Use the action picked by _quick_action instead of asking the LLM."""
+        action_data = _quick_action(state.get("game_data", {}))
+        self.logger.log_info("Action chosen without LLM", action_data)
+        return {"last_action": action_data}
 
     async def _evaluate_result(self, state: SimpleAgentState) -> Dict[str, Any]:
         """Evaluate the result of the action."""
-        last_action = state.get("last_action", "{}")
+        last_action = state.get("last_action", {})
         current_objective = state.get("current_objective", "explore_and_find_computer")
         turn_count = state.get("turn_count", 0) + 1
 
-        result = self.action_executor.execute(last_action)
+        result = await self.action_executor.execute(last_action)
+        self.logger.log_action(
+            last_action.get("action", ""), last_action.get("parameters"), result
+        )
 
         if result.get("success"):
             data = result.get("data", {})
@@ -267,4 +461,13 @@ class SimpleAgent:
             self.running = False
             return "end"
 
+        # Stop cleanly instead of running a turn that would hit the
+        # recursion limit and raise GraphRecursionError. Finishing the graph
+        # takes one step after the last node, so another turn only fits while
+        # more than STEPS_PER_TURN steps remain.
+        if state["remaining_steps"] <= STEPS_PER_TURN:
+            self.logger.log_info("Step budget exhausted, stopping")
+            self.running = False
+            return "end"
+
         return "continue"
@@ -1,6 +1,176 @@
 import json
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # orjson comes in via langgraph/langsmith, but is optional
+    orjson = None  # type: ignore[assignment]
+
+
+# Headers for request bodies serialized with json_dumpb.
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse JSON using orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, pretty: bool = False) -> str:
+    """
+    Serialize an object to a JSON string.
+
+    Uses orjson when available, which writes UTF-8 directly (the equivalent
+    of ``ensure_ascii=False``) and is considerably faster than stdlib json.
+
+    Args:
+        obj: The object to serialize
+        pretty: Indent the output with two spaces
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=_orjson_option(pretty)).decode()
+    return json.dumps(obj, indent=2 if pretty else None, ensure_ascii=False)
+
+
+def json_dumpb(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes (see json_dumps)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_orjson_option(pretty))
+    return json_dumps(obj, pretty=pretty).encode()
+
+
+def _orjson_option(pretty: bool) -> int:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return option
+
+
+class LazyJSON:
+    """
+    Defer JSON serialization until the value is actually formatted.
+
+    Pass an instance as a %-style logging argument so the dump only happens
+    when a handler emits the record. Output is compact unless ``pretty`` is
+    set, keeping log lines short.
+    """
+
+    __slots__ = ("obj", "pretty")
+
+    def __init__(self, obj: Any, pretty: bool = False):
+        self.obj = obj
+        self.pretty = pretty
+
+    def __str__(self) -> str:
+        return json_dumps(self.obj, pretty=self.pretty)
+
+
+class JsonObjectEnd:
+    """
+    Find where the first top-level JSON object in streamed text ends.
+
+    Braces are only counted once an object has started, and braces inside
+    its string values are ignored, so surrounding prose does not confuse it.
+    """
+
+    __slots__ = ("_depth", "_in_string", "_escaped")
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> int:
+        """
+        Scan the next piece of the stream.
+
+        Args:
+            text: The next piece of streamed text
+
+        Returns:
+            Index in ``text`` just past the object's closing brace, or -1 if
+            the object has not ended yet
+        """
+        for i, ch in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == "{":
+                self._depth += 1
+            elif not self._depth:
+                continue
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "}":
+                self._depth -= 1
+                if not self._depth:
+                    return i + 1
+        return -1
+
+
+_FENCED_JSON_PATTERNS = (
+    re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL),  # ```json {json} ```
+    re.compile(r"```\s*(\{.*?\})\s*```", re.DOTALL),  # ``` {json} ```
+    re.compile(r"`(\{.*?\})`", re.DOTALL),  # `{json}`
+)
+
+
+# Characters that can change brace depth or string state.
+_JSON_SCAN_TOKENS = re.compile(r'[{}"\\]')
+
+
+def _iter_json_objects(content: str) -> Iterator[str]:
+    """
+    Yield the non-overlapping balanced ``{...}`` spans in ``content``.
+
+    Makes a single pass over the text. Top-level spans are yielded as they
+    close; if the text ends inside an unclosed object, the outermost
+    complete spans nested in it are yielded afterwards.
+    """
+    starts: List[int] = []  # offset of the open brace at each depth
+    nested: List[Tuple[int, int]] = []  # closed spans inside an open object
+    in_string = False
+    escaped_at = -1
+    for match in _JSON_SCAN_TOKENS.finditer(content):
+        i = match.start()
+        ch = match.group()
+        if in_string:
+            if i == escaped_at:
+                continue
+            if ch == "\\":
+                escaped_at = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == "{":
+            starts.append(i)
+        elif not starts:
+            continue
+        elif ch == '"':
+            in_string = True
+        elif ch == "}":
+            start = starts.pop()
+            if not starts:
+                nested.clear()
+                yield content[start : i + 1]
+            else:
+                # Spans closed earlier at a deeper level lie inside this one.
+                while nested and nested[-1][0] > start:
+                    nested.pop()
+                nested.append((start, i + 1))
+    for start, end in nested:
+        yield content[start:end]
 
 
 def extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
@@ -21,30 +191,57 @@ def extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
 
     content = text.strip()
 
-    json_patterns = [
-        r"```json\s*(\{.*?\})\s*```",  # ```json {json} ```
-        r"```\s*(\{.*?\})\s*```",  # ``` {json} ```
-        r"`(\{.*?\})`",  # `{json}`
-    ]
+    # Fast path: the verify prompt asks for a bare JSON object, so try the
+    # span from the first "{" to the last "}" before any regex scanning.
+    start, end = content.find("{"), content.rfind("}")
+    if 0 <= start < end:
+        try:
+            return json_loads(content[start : end + 1])
+        except json.JSONDecodeError:
+            pass
 
-    for pattern in json_patterns:
-        matches = re.findall(pattern, content, re.DOTALL)
+    for pattern in _FENCED_JSON_PATTERNS:
+        matches = pattern.findall(content)
         if matches:
             for match in matches:
                 try:
-                    return json.loads(match.strip())
+                    return json_loads(match.strip())
                 except json.JSONDecodeError:
                     continue
 
-    json_objects = re.findall(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", content)
-
-    for json_str in json_objects:
+    for json_str in _iter_json_objects(content):
         try:
-            return json.loads(json_str.strip())
+            return json_loads(json_str)
         except json.JSONDecodeError:
             continue
 
     try:
-        return json.loads(content)
+        return json_loads(content)
     except json.JSONDecodeError:
         return None
+
+
+class LazyAsyncClient:
+    """
+    An httpx.AsyncClient that is only opened on first use.
+
+    An AsyncClient is bound to the event loop it is first used on, so it
+    cannot be built in a constructor that may run outside that loop.
+    Keyword arguments are passed to httpx.AsyncClient unchanged.
+    """
+
+    def __init__(self, **client_kwargs: Any):
+        self._client_kwargs = client_kwargs
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        """Return the client, opening it on the running loop if needed."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the client, if it was opened; client() opens a new one."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
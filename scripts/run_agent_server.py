@@ -13,7 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 def main():
     """Run the AI agent server."""
     try:
-        from agents.server import app
+        from agents.server import run_server
 
         print("🤖 Starting AI Agent Server...")
         print("📍 Server will be available at: http://localhost:5001")
@@ -22,11 +22,13 @@ def main():
         print("   POST /api/agent/start - Start the AI agent")
         print("   POST /api/agent/stop - Stop the AI agent")
         print("   GET  /api/agent/status - Get agent status")
+        print("   GET  /api/agent/heartbeat - Check whether the agent is running")
+        print("   GET  /api/agent/results - Get the latest agent results")
         print("   GET  /api/agent/test - Test connection to game")
         print("   POST /api/agent/move - Make a single move")
         print()
 
-        app.run(host="0.0.0.0", port=5001, debug=True)
+        run_server()
 
     except ImportError as e:
         print(f"❌ Import error: {e}")
@@ -1,3 +1,4 @@
+import { createHash } from 'crypto';
 import { gameState } from '@/lib/gameState';
 import { MoveStepResult, MultiMoveRequest, MultiMoveResponse } from '@/lib/gameTypes';
 import { NextRequest, NextResponse } from 'next/server';
@@ -103,8 +104,8 @@ export async function POST(request: NextRequest) {
 }
 
 // GET endpoint to get current character state
-export async function GET() {
-  return NextResponse.json({
+export async function GET(request: NextRequest) {
+  const body = JSON.stringify({
     success: true,
     data: {
       agents: gameState.getAllAgentPositions(),
@@ -114,4 +115,14 @@ export async function GET() {
       available_actions: gameState.getAvailableActions()
     }
   });
+
+  // Let pollers skip the body when the state has not changed since their last read
+  const etag = `"${createHash('sha1').update(body).digest('base64url')}"`;
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers: { ETag: etag } });
+  }
+
+  return new NextResponse(body, {
+    headers: { 'Content-Type': 'application/json', ETag: etag }
+  });
 } 
\ No newline at end of file
@@ -63,9 +63,6 @@ export default function AgentControls() {
       const data = await response.json();
       if (data.success) {
         console.log('Agent started successfully');
-        // Start polling for status updates
-        const statusInterval = setInterval(getAgentStatus, 1000);
-        setTimeout(() => clearInterval(statusInterval), 60000); // Stop after 1 minute
       } else {
         console.error('Failed to start agent:', data.error);
       }
@@ -103,12 +100,29 @@ export default function AgentControls() {
     return () => clearInterval(interval);
   }, []);
 
+  // Follow agent results pushed by the agent server instead of polling status
   useEffect(() => {
-    if (agentStatus?.running) {
-      const interval = setInterval(getAgentStatus, 1000);
-      return () => clearInterval(interval);
-    }
-  }, [agentStatus?.running]);
+    const resultsSource = new EventSource(`${AGENT_SERVER_URL}/api/agent/results/stream`);
+
+    // The server replays its latest results on every (re)connect
+    resultsSource.onopen = () => {
+      setAgentStatus((prev) => (prev ? { ...prev, results: [] } : prev));
+    };
+
+    resultsSource.onmessage = (event) => {
+      try {
+        const data = JSON.parse(event.data);
+        setAgentStatus((prev) => ({
+          running: data.running,
+          results: [...(prev?.results ?? []), data.result].slice(-10),
+        }));
+      } catch (error) {
+        console.error('Failed to parse agent result:', error);
+      }
+    };
+
+    return () => resultsSource.close();
+  }, []);
 
   // Auto-scroll live stream to the latest message
   useEffect(() => {